@@ -1 +1,5 @@
-print('Я домашка'
+"""Thin entry point: the game itself lives in yandex.py."""
+from yandex import main
+
+if __name__ == '__main__':
+    main()
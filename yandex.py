@@ -1,5 +1,6 @@
 import pygame  # type: ignore
 import random
+from array import array
 from pygame.locals import (  # type: ignore
     K_UP, K_DOWN, K_LEFT, K_RIGHT, QUIT, KEYDOWN
 )
@@ -9,15 +10,52 @@ GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 
+RENDER_FPS = 60
+MAX_LAG_STEPS = 4
+
 UP = (0, -1)
 DOWN = (0, 1)
 LEFT = (-1, 0)
 RIGHT = (1, 0)
 
+UP_PX = (0, -GRID_SIZE)
+DOWN_PX = (0, GRID_SIZE)
+LEFT_PX = (-GRID_SIZE, 0)
+RIGHT_PX = (GRID_SIZE, 0)
+
 BOARD_BACKGROUND_COLOR = (0, 0, 0)
 SNAKE_COLOR = (0, 255, 0)
 APPLE_COLOR = (255, 0, 0)
 
+CELL_RECTS = {}
+SNAKE_SURF = None
+APPLE_SURF = None
+BG_SURF = None
+
+
+def _make_cell_surface(color, border=True):
+    surf = pygame.Surface((GRID_SIZE, GRID_SIZE))
+    surf.fill(color)
+    if border:
+        pygame.draw.rect(surf, (255, 255, 255), surf.get_rect(), 1)
+    return surf.convert()
+
+
+def init_graphics():
+    """Precompute per-cell rects and prerendered cell surfaces.
+
+    Must run after pygame.display.set_mode so that convert() matches
+    the display pixel format.
+    """
+    global SNAKE_SURF, APPLE_SURF, BG_SURF
+    for x in range(GRID_WIDTH):
+        for y in range(GRID_HEIGHT):
+            pos = (x * GRID_SIZE, y * GRID_SIZE)
+            CELL_RECTS[pos] = pygame.Rect(pos, (GRID_SIZE, GRID_SIZE))
+    SNAKE_SURF = _make_cell_surface(SNAKE_COLOR)
+    APPLE_SURF = _make_cell_surface(APPLE_COLOR)
+    BG_SURF = _make_cell_surface(BOARD_BACKGROUND_COLOR, border=False)
+
 class GameObject:
     def __init__(self, position=None, body_color=None):
         if position is None:
@@ -32,22 +70,20 @@ class GameObject:
 
 
 class Apple(GameObject):
-    def __init__(self):
+    def __init__(self, free_cells):
         super().__init__()
         self.body_color = APPLE_COLOR
-        self.randomize_position()
+        self.randomize_position(free_cells)
 
 
-    def randomize_position(self):
-        x = random.randint(0, GRID_WIDTH - 1) * GRID_SIZE
-        y = random.randint(0, GRID_HEIGHT - 1) * GRID_SIZE
-        self.position = (x, y)
+    def randomize_position(self, free_cells):
+        self.position = random.choice(free_cells)
 
 
     def draw(self, surface):
-        rect = pygame.Rect(self.position, (GRID_SIZE, GRID_SIZE))
-        pygame.draw.rect(surface, self.body_color, rect)
-        pygame.draw.rect(surface, (255, 255, 255), rect, 1)
+        rect = CELL_RECTS[self.position]
+        surface.blit(APPLE_SURF, rect)
+        return rect
 
 class Snake(GameObject):
     def __init__(self):
@@ -61,15 +97,55 @@ class Snake(GameObject):
         self.length = 1
         center_x = (SCREEN_WIDTH // 2) // GRID_SIZE * GRID_SIZE
         center_y = (SCREEN_HEIGHT // 2) // GRID_SIZE * GRID_SIZE
-        self.positions = [(center_x, center_y)]
-        self.direction = RIGHT
+        self._xs = array('h', [0]) * (GRID_WIDTH * GRID_HEIGHT)
+        self._ys = array('h', [0]) * (GRID_WIDTH * GRID_HEIGHT)
+        self._xs[0] = center_x
+        self._ys[0] = center_y
+        self._head = 0
+        self._len = 1
+        self.occupied = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.occupied[(center_y // GRID_SIZE) * GRID_WIDTH
+                      + center_x // GRID_SIZE] = 1
+        self.free_cells = [
+            (x * GRID_SIZE, y * GRID_SIZE)
+            for x in range(GRID_WIDTH)
+            for y in range(GRID_HEIGHT)
+        ]
+        self._free_idx = {cell: i for i, cell in enumerate(self.free_cells)}
+        self._free_remove((center_x, center_y))
+        self.direction = RIGHT_PX
         self.next_direction = None
         self.last = None
+        self.full_redraw = True
+
+
+    @property
+    def positions(self):
+        """Return the body cells in head-to-tail order."""
+        size = len(self._xs)
+        return [(self._xs[(self._head + i) % size],
+                 self._ys[(self._head + i) % size])
+                for i in range(self._len)]
 
 
     def get_head_position(self):
         """Return the position of the snake's head."""
-        return self.positions[0]
+        return (self._xs[self._head], self._ys[self._head])
+
+
+    def _free_add(self, cell):
+        """Mark a cell as free in O(1)."""
+        self._free_idx[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+
+    def _free_remove(self, cell):
+        """Mark a cell as occupied in O(1) (swap with the last free cell)."""
+        idx = self._free_idx.pop(cell)
+        last_cell = self.free_cells.pop()
+        if last_cell != cell:
+            self.free_cells[idx] = last_cell
+            self._free_idx[last_cell] = idx
 
 
     def update_direction(self):
@@ -80,75 +156,119 @@ class Snake(GameObject):
             self.next_direction = None
 
 
-    def move(self):
-        """Move the snake in the current direction."""
-        self.last = self.positions[-1] if self.positions else None
-        head = self.get_head_position()
-        x, y = head
+    def move(self, _w=SCREEN_WIDTH, _h=SCREEN_HEIGHT,
+             _gs=GRID_SIZE, _gw=GRID_WIDTH):
+        """Move the snake one cell in the current direction.
+
+        The keyword defaults bind hot globals once at definition time so
+        the per-tick body only uses LOAD_FAST lookups.
+        """
+        size = len(self._xs)
+        x = self._xs[self._head]
+        y = self._ys[self._head]
         dx, dy = self.direction
-        new_x = (x + dx * GRID_SIZE) % SCREEN_WIDTH
-        new_y = (y + dy * GRID_SIZE) % SCREEN_HEIGHT
+        new_x = x + dx
+        if new_x < 0:
+            new_x += _w
+        elif new_x >= _w:
+            new_x -= _w
+        new_y = y + dy
+        if new_y < 0:
+            new_y += _h
+        elif new_y >= _h:
+            new_y -= _h
         new_head = (new_x, new_y)
-        if new_head in self.positions[:-1]:
+        if self._len < self.length:
+            self._len += 1
+            self.last = None
+        else:
+            tail = (self._head + self._len - 1) % size
+            last_x = self._xs[tail]
+            last_y = self._ys[tail]
+            self.last = (last_x, last_y)
+            self.occupied[(last_y // _gs) * _gw + last_x // _gs] = 0
+            self._free_add(self.last)
+        new_idx = (new_y // _gs) * _gw + new_x // _gs
+        if self.occupied[new_idx]:
             self.reset()
             return
-        self.positions.insert(0, new_head)
-        if len(self.positions) > self.length:
-            self.positions.pop()
+        self.occupied[new_idx] = 1
+        self._free_remove(new_head)
+        self._head = (self._head - 1) % size
+        self._xs[self._head] = new_x
+        self._ys[self._head] = new_y
 
 
     def draw(self, surface):
-        """Draw the snake on the given surface."""
+        """Draw the changed cells and return their rects."""
+        if self.full_redraw:
+            self.full_redraw = False
+            surface.fill(BOARD_BACKGROUND_COLOR)
+            surface.blits([(SNAKE_SURF, CELL_RECTS[position])
+                           for position in self.positions], doreturn=False)
+            return [surface.get_rect()]
+        dirty = []
         if self.last:
-            last_rect = pygame.Rect(self.last, (GRID_SIZE, GRID_SIZE))
-            pygame.draw.rect(surface, BOARD_BACKGROUND_COLOR, last_rect)
-        for position in self.positions:
-            rect = pygame.Rect(position, (GRID_SIZE, GRID_SIZE))
-            pygame.draw.rect(surface, self.body_color, rect)
-            pygame.draw.rect(surface, (255, 255, 255), rect, 1)
+            last_rect = CELL_RECTS[self.last]
+            surface.blit(BG_SURF, last_rect)
+            dirty.append(last_rect)
+        head_rect = CELL_RECTS[self.get_head_position()]
+        surface.blit(SNAKE_SURF, head_rect)
+        dirty.append(head_rect)
+        return dirty
+
+
+_KEYMAP = {K_UP: UP_PX, K_DOWN: DOWN_PX, K_LEFT: LEFT_PX, K_RIGHT: RIGHT_PX}
+_HANDLED_EVENTS = (KEYDOWN, QUIT)
 
 
-def handle_keys(snake):
+def handle_keys(snake, _get=pygame.event.get, _events=_HANDLED_EVENTS,
+                _keymap_get=_KEYMAP.get, _keydown=KEYDOWN, _quit=QUIT):
     """Handle keypress events to set snake direction or quit."""
-    for event in pygame.event.get():
-        if event.type == QUIT:
+    for event in _get(_events):
+        event_type = event.type
+        if event_type == _keydown:
+            direction = _keymap_get(event.key)
+            if direction is not None:
+                snake.next_direction = direction
+        elif event_type == _quit:
             pygame.quit()
             exit()
-        elif event.type == KEYDOWN:
-            if event.key == K_UP:
-                snake.next_direction = UP
-            elif event.key == K_DOWN:
-                snake.next_direction = DOWN
-            elif event.key == K_LEFT:
-                snake.next_direction = LEFT
-            elif event.key == K_RIGHT:
-                snake.next_direction = RIGHT
 
 
 def main():
     pygame.init()
     clock = pygame.time.Clock()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                     pygame.SCALED)
     pygame.display.set_caption('Изгиб Питона')
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(_HANDLED_EVENTS)
+    init_graphics()
     snake = Snake()
-    apple = Apple()
-    base_speed = 5
+    apple = Apple(snake.free_cells)
+    sim_hz = 5
+    accumulator = 0.0
     while True:
+        accumulator += clock.tick(RENDER_FPS) / 1000.0
+        if accumulator > MAX_LAG_STEPS / sim_hz:
+            accumulator = MAX_LAG_STEPS / sim_hz
         handle_keys(snake)
-        snake.update_direction()
-        snake.move()
-        if snake.get_head_position() == apple.position:
-            snake.length += 1
-            apple.randomize_position()
-            while apple.position in snake.positions:
-                apple.randomize_position()
-            if snake.length % 1 == 0:
-                base_speed += 0.5
-        screen.fill(BOARD_BACKGROUND_COLOR)
-        snake.draw(screen)
-        apple.draw(screen)
-        pygame.display.update()
-        clock.tick(base_speed)
+        dirty = []
+        while accumulator >= 1.0 / sim_hz:
+            accumulator -= 1.0 / sim_hz
+            snake.update_direction()
+            snake.move()
+            if snake.get_head_position() == apple.position:
+                snake.length += 1
+                apple.randomize_position(snake.free_cells)
+                sim_hz += 0.5
+            dirty += snake.draw(screen)
+        if snake.full_redraw:
+            dirty += snake.draw(screen)
+        if dirty:
+            dirty.append(apple.draw(screen))
+            pygame.display.update(dirty)
 
 
 if __name__ == '__main__':